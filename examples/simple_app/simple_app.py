@@ -1,6 +1,11 @@
+from itertools import chain
+
 from jaiger.main import Jaiger
 
 
+_CALL_FORMAT = "\n\033[93m> Calling {tool}.{function}({args})\033[0m".format
+
+
 class SimpleApp:
     def __init__(self, config: str) -> None:
         self._jaiger = Jaiger(config)
@@ -14,12 +19,13 @@ class SimpleApp:
         self._jaiger.stop()
 
     def on_call(self, call):
-        args = [repr(arg) for arg in call.args] + [
-            f"{k}={repr(v)}" for k, v in call.kwargs.items()
-        ]
-        print(
-            f"\n\033[93m> Calling {call.tool}.{call.function}({', '.join(args)})\033[0m"
+        args = ", ".join(
+            chain(
+                map(repr, call.args),
+                (f"{k}={v!r}" for k, v in call.kwargs.items()),
+            )
         )
+        print(_CALL_FORMAT(tool=call.tool, function=call.function, args=args))
 
     def run(self):
         print(
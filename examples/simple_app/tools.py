@@ -34,9 +34,11 @@ class FileTool(Tool):
         """
 
         filepath = Path(filename).expanduser()
-        filepath.touch(exist_ok=exist_ok)
-        if content != "":
-            filepath.write_text(content, encoding="utf-8")
+        if content == "" and exist_ok:
+            filepath.touch()
+        else:
+            with filepath.open("w" if exist_ok else "x", encoding="utf-8") as f:
+                f.write(content)
 
         return filename
 
@@ -52,11 +54,11 @@ class FileTool(Tool):
         """
 
         filepath = Path(filename).expanduser()
-        if not filepath.is_file():
-            filepath.touch()
-
-        with open(str(filepath), "a" if append else "w") as f:
-            f.write(content)
+        if append:
+            with filepath.open("ab") as f:
+                f.write(content.encode("utf-8"))
+        else:
+            filepath.write_bytes(content.encode("utf-8"))
 
         return filename
 
@@ -1,10 +1,39 @@
+from functools import lru_cache
 from html import escape
+from pathlib import Path
+from threading import Lock
+from typing import Callable
+from urllib.parse import urlsplit
+
 from chope import *
-from markdown import markdown
+from markdown import Markdown
+
+STATIC_DIR = Path(__file__).parent / "static"
+
+# Self-hosted copies of the front-end assets (see fetch_static.py), keyed by versioned filename
+STATIC_ASSETS = {
+    "bootstrap.v5.3.5.min.css": "https://cdn.jsdelivr.net/npm/bootstrap@5.3.5/dist/css/bootstrap.min.css",
+    "bootstrap.v5.3.5.bundle.min.js": "https://cdn.jsdelivr.net/npm/bootstrap@5.3.5/dist/js/bootstrap.bundle.min.js",
+    "bootswatch-quartz.v5.3.3.min.css": "https://cdnjs.cloudflare.com/ajax/libs/bootswatch/5.3.3/quartz/bootstrap.min.css",
+    "alpinejs.v3.14.9.min.js": "https://cdn.jsdelivr.net/npm/alpinejs@3.14.9/dist/cdn.min.js",
+    "htmx.v2.0.4.min.js": "https://unpkg.com/htmx.org@2.0.4",
+    "htmx-ext-sse.v2.2.2.js": "https://unpkg.com/htmx-ext-sse@2.2.2",
+    "htmx-ext-json-enc.v1.9.12.js": "https://unpkg.com/htmx.org@1.9.12/dist/ext/json-enc.js",
+}
+
+
+def static_url(filename: str) -> str:
+    """Serves the asset from /static when it has been downloaded, otherwise from its CDN."""
+
+    if (STATIC_DIR / filename).is_file():
+        return f"/static/{filename}"
+
+    return STATIC_ASSETS[filename]
+
 
 # Bootstrap 5 CSS
 bootstrap_css = link(
-    href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.5/dist/css/bootstrap.min.css",
+    href=static_url("bootstrap.v5.3.5.min.css"),
     rel="stylesheet",
     integrity="sha384-SgOJa3DmI69IUzQ2PVdRZhwQ+dy64/BUtbMJw1MZ8t5HZApcHrRKUc4W0kG879m7",
     crossorigin="anonymous",
@@ -12,7 +41,7 @@ bootstrap_css = link(
 
 # Bootstrap 5 JS
 bootstrap_js = script(
-    src="https://cdn.jsdelivr.net/npm/bootstrap@5.3.5/dist/js/bootstrap.bundle.min.js",
+    src=static_url("bootstrap.v5.3.5.bundle.min.js"),
     integrity="sha384-k6d4wzSIapyDyv1kpU366/PK5hCdSbCRGRCMv+eplOQJWyd1fbcAu9OCUj5zNLiq",
     crossorigin="anonymous",
 )
@@ -20,16 +49,14 @@ bootstrap_js = script(
 # Bootswatch Quartz Theme
 bootswatch_css = link(
     rel="stylesheet",
-    href="https://cdnjs.cloudflare.com/ajax/libs/bootswatch/5.3.3/quartz/bootstrap.min.css",
+    href=static_url("bootswatch-quartz.v5.3.3.min.css"),
     integrity="sha512-K+FEHZnRHFnQ6iahLNQUCHNpKDHkrYxHZmzFjOJteRPjBhjLmOgJgGJsIYBDOS1wYxcSVvAcfg3ZFpm6tnbhOA==",
     crossorigin="anonymous",
     referrerpolicy="no-referrer",
 )
 
 # Alpine.js (deferred)
-alpine_js = script(
-    defer=True, src="https://cdn.jsdelivr.net/npm/alpinejs@3.x.x/dist/cdn.min.js"
-)
+alpine_js = script(defer=True, src=static_url("alpinejs.v3.14.9.min.js"))
 
 # Google Material Symbols
 material_icons = link(
@@ -39,18 +66,18 @@ material_icons = link(
 
 # HTMX
 htmx_js = script(
-    src="https://unpkg.com/htmx.org@2.0.4",
+    src=static_url("htmx.v2.0.4.min.js"),
     integrity="sha384-HGfztofotfshcF7+8n44JQL2oJmowVChPTg48S+jvZoztPfvwD79OC/LTtG6dMp+",
     crossorigin="anonymous",
 )
 
 # HTMX SSE
 htmx_ext_sse_js = script(
-    src="https://unpkg.com/htmx-ext-sse@2.2.2",
+    src=static_url("htmx-ext-sse.v2.2.2.js"),
 )
 
 # HTMX Json
-htmx_json_enc_js = script(src="https://unpkg.com/htmx.org@1.9.12/dist/ext/json-enc.js")
+htmx_json_enc_js = script(src=static_url("htmx-ext-json-enc.v1.9.12.js"))
 
 navbar = nav(
     class_="navbar navbar-expand-lg bg-primary",
@@ -72,64 +99,22 @@ navbar = nav(
 
 
 class UserBubble:
-    def __new__(cls, content: str) -> Element:
-        return div(hx_swap_oob="beforebegin:#bubbles-end")[
-            div(class_="container")[
-                div(class_="d-flex justify-content-end ms-2")[
-                    div(class_="card text-bg-light m-2")[p(class_="m-2")[
-                        escape(content)
-                    ]]
-                ]
-            ]
-        ]
+    def __new__(cls, content: str) -> str:
+        return _render_user_bubble(content)
 
 
 class ReplyBubble:
-    def __new__(cls, content: str) -> Element:
-        converted = markdown(
-            content,
-            extensions=['fenced_code', 'tables', 'sane_lists'],
-            output_format='html'
-        ).replace('\n', '')
-        return div(class_="container")[
-            div(class_="d-flex justify-content-start ms-2")[
-                div(class_="card m-2")[
-                    div(class_="card-body")[
-                        h6(class_="card-subtitle mb-2 text-muted")["AI"],
-                        p(class_="card-text")[
-                            converted
-                        ],
-                    ]
-                ]
-            ]
-        ]
+    def __new__(cls, content: str) -> str:
+        return _render_reply_bubble(content)
 
 
 class ReplyLoading:
-    def __new__(cls):
-        return div(hx_swap_oob="beforebegin:#bubbles-end")[
-            div(sse_swap="newResponse", hx_swap="outerHTML")[
-                div(class_="container")[
-                    div(id="spinner", class_="d-flex justify-content-start")[
-                        div(class_="card m-2")[
-                            div(class_="card-footer")[
-                                div(
-                                    class_="spinner-grow spinner-grow-sm text-light",
-                                    role="status",
-                                )[span(class_="visually-hidden")["Loading ..."],],
-                                div(class_="mt-1")[
-                                    p(sse_swap="newCall", hx_swap="outerHTML")
-                                ],
-                            ]
-                        ]
-                    ]
-                ]
-            ]
-        ]
+    def __new__(cls) -> str:
+        return _REPLY_LOADING_HTML
 
 
 class Root:
-    def __new__(cls):
+    def __new__(cls) -> Element:
         return html[
             head[
                 bootswatch_css,
@@ -190,3 +175,99 @@ class Root:
                 ]
             ],
         ]
+
+
+# Pre-rendered static markup
+_SLOT = "\x00"
+
+
+def _compile_bubble(
+    template: Element, fill: Callable[[str], str]
+) -> Callable[[str], str]:
+    prefix, suffix = template.render(0).split(_SLOT)
+
+    def render(content: str) -> str:
+        return f"{prefix}{fill(content)}{suffix}"
+
+    return render
+
+
+# A Markdown instance is reusable after reset() but not thread-safe
+_markdown = Markdown(
+    extensions=["fenced_code", "tables", "sane_lists"], output_format="html"
+)
+_markdown_lock = Lock()
+
+
+@lru_cache(maxsize=256)
+def _convert_markdown(content: str) -> str:
+    with _markdown_lock:
+        return _markdown.reset().convert(content).replace("\n", "")
+
+
+_render_user_bubble = _compile_bubble(
+    div(hx_swap_oob="beforebegin:#bubbles-end")[
+        div(class_="container")[
+            div(class_="d-flex justify-content-end ms-2")[
+                div(class_="card text-bg-light m-2")[p(class_="m-2")[_SLOT]]
+            ]
+        ]
+    ],
+    # chope renders line breaks in text as <br>, so multi-line prompts keep them
+    lambda s: escape(s).replace("\n", "<br>"),
+)
+
+_render_reply_bubble = _compile_bubble(
+    div(class_="container")[
+        div(class_="d-flex justify-content-start ms-2")[
+            div(class_="card m-2")[
+                div(class_="card-body")[
+                    h6(class_="card-subtitle mb-2 text-muted")["AI"],
+                    p(class_="card-text")[_SLOT],
+                ]
+            ]
+        ]
+    ],
+    _convert_markdown,
+)
+
+_REPLY_LOADING_HTML = div(hx_swap_oob="beforebegin:#bubbles-end")[
+    div(sse_swap="newResponse", hx_swap="outerHTML")[
+        div(class_="container")[
+            div(id="spinner", class_="d-flex justify-content-start")[
+                div(class_="card m-2")[
+                    div(class_="card-footer")[
+                        div(
+                            class_="spinner-grow spinner-grow-sm text-light",
+                            role="status",
+                        )[span(class_="visually-hidden")["Loading ..."],],
+                        div(class_="mt-1")[
+                            p(sse_swap="newCall", hx_swap="outerHTML")
+                        ],
+                    ]
+                ]
+            ]
+        ]
+    ]
+].render(0)
+
+ROOT_HTML = Root().render(0)
+
+# Lets the browser open connections and fetch render-blocking assets while the page is still loading
+LINK_HEADER = ", ".join(
+    [
+        f"<{origin}>; rel=preconnect; crossorigin"
+        for origin in sorted(
+            {
+                "{0.scheme}://{0.netloc}".format(urlsplit(static_url(filename)))
+                for filename in STATIC_ASSETS
+                if static_url(filename).startswith("https://")
+            }
+            | {"https://fonts.googleapis.com", "https://fonts.gstatic.com"}
+        )
+    ]
+    + [
+        f"<{static_url('bootswatch-quartz.v5.3.3.min.css')}>; rel=preload; as=style; crossorigin",
+        f"<{static_url('htmx.v2.0.4.min.js')}>; rel=preload; as=script; crossorigin",
+    ]
+)
@@ -0,0 +1,16 @@
+from urllib.request import urlopen
+
+from components import STATIC_ASSETS, STATIC_DIR
+
+
+def fetch_static():
+    STATIC_DIR.mkdir(exist_ok=True)
+
+    for filename, url in STATIC_ASSETS.items():
+        print(f"Downloading {url} ...")
+        with urlopen(url) as response:
+            (STATIC_DIR / filename).write_bytes(response.read())
+
+
+if __name__ == "__main__":
+    fetch_static()
@@ -1,13 +1,24 @@
-import time
-from concurrent.futures import ThreadPoolExecutor
-from queue import Empty, Queue
+import asyncio
 import traceback
-from typing import Callable
+import zlib
+from contextlib import asynccontextmanager
+from html import escape
+from itertools import chain
+from typing import AsyncIterator, Callable, Optional, Set
 
 import uvicorn
-from components import ReplyBubble, ReplyLoading, Root, UserBubble
-from fastapi import FastAPI
+from components import (
+    LINK_HEADER,
+    ROOT_HTML,
+    STATIC_DIR,
+    ReplyBubble,
+    ReplyLoading,
+    UserBubble,
+)
+from fastapi import FastAPI, Request
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse
+from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from jaiger.configs import HttpConfig
 from jaiger.http.http_client import HttpClient
@@ -15,54 +26,96 @@ from jaiger.http.http_client import HttpClient
 from jaiger.main import Jaiger
 
 
+_NEW_CALL_PREFIX = (
+    'event: newCall\ndata: <p sse-swap="newCall" hx-swap="outerHTML">Calling '
+)
+_NEW_CALL_SUFFIX = " ...</p>\n\n"
+
+
 class PromptParams(BaseModel):
     text: str
 
 class App(FastAPI):
     def __init__(self, http_config: HttpConfig, on_quit: Callable[[], None], *args, **kwargs):
-        super().__init__(*args, **kwargs)
+        super().__init__(*args, lifespan=self.lifespan, **kwargs)
 
         self.get("/")(self.index)
         self.post("/prompt")(self.prompt)
         self.get("/reset")(self.reset)
         self.get("/sse")(self.sse)
         self.get("/quit")(self.quit)
+        if STATIC_DIR.is_dir():
+            self.mount("/static", StaticFiles(directory=STATIC_DIR))
+        self.middleware("http")(self.set_cache_control)
+        self.add_middleware(GZipMiddleware, minimum_size=512, compresslevel=5)
 
-        self._events_queue = Queue()
+        # both belong to the server's event loop, so they are only set up once it runs
+        self._events_queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
 
-        self._pool = ThreadPoolExecutor()
+        # keeps running prompts referenced until they finish
+        self._prompt_tasks: Set[asyncio.Task] = set()
 
         self._jaiger_client = HttpClient(http_config)
 
         self._on_quit = on_quit
 
-    def index(self):
-        return HTMLResponse(Root().render(indent=0))
+    async def set_cache_control(self, request: Request, call_next):
+        response = await call_next(request)
 
-    def prompt(self, params: PromptParams):
-        def get_ai_answer():
-            try:
-                result = self._jaiger_client.call("prompt", ["my_ai", params.text])
-                if result.error:
-                    raise RuntimeError(f'Error while prompting:\n{result.error}')
-                answer = result.result
-            except Exception as e:
-                answer = ''.join(traceback.TracebackException.from_exception(e).format())
+        # static assets have versioned filenames, so they never need revalidation
+        if request.url.path.startswith("/static/"):
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        elif request.url.path == "/":
+            response.headers["Cache-Control"] = "no-cache"
 
-            bubble = ReplyBubble(answer).render(0)
+        return response
 
-            event = f"event: newResponse\ndata: {bubble}\n\n"
-            self._events_queue.put(event)
+    @asynccontextmanager
+    async def lifespan(self, app: FastAPI):
+        self._events_queue = asyncio.Queue()
+        self._loop = asyncio.get_running_loop()
 
-        response = HTMLResponse(
-            UserBubble(params.text).render(indent=0) + ReplyLoading().render(indent=0)
-        )
+        yield
 
-        self._pool.submit(get_ai_answer)
+        self._loop = None
+        self._jaiger_client.close()
 
-        return response
+    async def index(self):
+        return HTMLResponse(ROOT_HTML, headers={"Link": LINK_HEADER})
+
+    async def prompt(self, params: PromptParams):
+        task = asyncio.create_task(self._run_prompt(params.text))
+        self._prompt_tasks.add(task)
+        task.add_done_callback(self._prompt_tasks.discard)
+
+        return HTMLResponse(UserBubble(params.text) + ReplyLoading())
+
+    async def _run_prompt(self, text: str):
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(
+                None, self._jaiger_client.call, "prompt", ["my_ai", text]
+            )
+            if result.error:
+                raise RuntimeError(f'Error while prompting:\n{result.error}')
+            answer = result.result
+        except Exception as e:
+            answer = ''.join(traceback.TracebackException.from_exception(e).format())
+
+        bubble = ReplyBubble(answer)
+
+        event = f"event: newResponse\ndata: {bubble}\n\n"
+        await self._events_queue.put(event)
+
+    async def sse(self, request: Request):
+        # GZipMiddleware skips event streams, so compress them here with a flush after every event
+        if "gzip" in request.headers.get("accept-encoding", ""):
+            return StreamingResponse(
+                self.gzip_events(self.events_generator()),
+                media_type="text/event-stream",
+                headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"},
+            )
 
-    def sse(self):
         return StreamingResponse(
             self.events_generator(), media_type="text/event-stream"
         )
@@ -77,45 +130,67 @@ class App(FastAPI):
         except Exception as e:
             return HTMLResponse(f"Failed to reset:\n{''.join(traceback.TracebackException.from_exception(e).format())}")
 
-    def events_generator(self):
-        item = ""
+    async def events_generator(self):
+        queue = self._events_queue
         while True:
-            try:
-                item = self._events_queue.get()
+            item = await queue.get()
+            if item == "stop":
+                break
+
+            # drain whatever else is already queued so bursts go out in a single write
+            events = [item]
+            while not queue.empty():
+                item = queue.get_nowait()
                 if item == "stop":
-                    break
-                else:
-                    yield item
-            except Empty:
-                time.sleep(0.01)
+                    yield "".join(events)
+                    return
+                events.append(item)
+
+            yield "".join(events)
+
+    async def gzip_events(self, events: AsyncIterator[str]):
+        compressor = zlib.compressobj(level=5, wbits=31)
+        async for event in events:
+            yield compressor.compress(event.encode()) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+        yield compressor.flush()
 
     def quit(self):
-        self._events_queue.put("stop")
-        self._pool.shutdown(wait=False)
+        self._put_event("stop")
 
         self._on_quit()
 
         return HTMLResponse('<h1 class="m-2">Bye bye</h1>')
     
     def on_call(self, call):
-        args = [repr(arg) for arg in call.args] + [
-            f"{k}={repr(v)}" for k, v in call.kwargs.items()
-        ]
+        args = ", ".join(
+            chain(
+                map(repr, call.args),
+                (f"{k}={v!r}" for k, v in call.kwargs.items()),
+            )
+        )
 
-        message = f"Calling {call.tool}.{call.function}({', '.join(args)}) ..."
+        self._put_event(
+            f"{_NEW_CALL_PREFIX}{escape(f'{call.tool}.{call.function}({args})', quote=False)}{_NEW_CALL_SUFFIX}"
+        )
 
-        event = f'event: newCall\ndata: <p sse-swap="newCall" hx-swap="outerHTML">{message}</p>\n\n'
-        self._events_queue.put(event)
+    def _put_event(self, event: str):
+        # events are produced on worker threads, so hand them over to the event loop;
+        # there is no one to receive them before the server has started
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._events_queue.put_nowait, event)
 
 
 class WebUiApp(Jaiger):
     def __init__(self, config: str) -> None:
         super().__init__(config)
 
-        self._app = App(self.config().settings.server.http, self._stop_server, workers=2)
+        self._app = App(self.config().settings.server.http, self._stop_server)
 
         self._server = uvicorn.Server(
-            uvicorn.Config(app=self._app, host="127.0.0.1", port=7613, workers=2)
+            uvicorn.Config(
+                app=self._app, host="127.0.0.1", port=7613, access_log=False
+            )
         )
 
     def __enter__(self):
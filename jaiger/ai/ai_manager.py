@@ -1,17 +1,21 @@
-import traceback
+import importlib
 from concurrent.futures import ThreadPoolExecutor
 from logging import getLogger
 from typing import Dict, List
 
-from jaiger.ai.anthropic_model import AnthropicModel
-from jaiger.ai.google_model import GoogleModel
 from jaiger.ai.model import Model
-from jaiger.ai.ollama_model import OllamaModel
-from jaiger.ai.openai_model import OpenAIModel
 from jaiger.configs import AiConfig
 from jaiger.models import PromptResult
 from jaiger.tool.tool_manager import ToolInfo
 
+# provider SDKs are heavy to import, so each model is only loaded once it is used
+_MODELS = {
+    "google": ("jaiger.ai.google_model", "GoogleModel"),
+    "anthropic": ("jaiger.ai.anthropic_model", "AnthropicModel"),
+    "openai": ("jaiger.ai.openai_model", "OpenAIModel"),
+    "ollama": ("jaiger.ai.ollama_model", "OllamaModel"),
+}
+
 
 class AiManager:
     def __init__(self) -> None:
@@ -22,39 +26,51 @@ class AiManager:
         self._logger = getLogger("jaiger")
 
     def ais(self) -> List[str]:
-        return [name for name in self._ais]
+        return list(self._ais)
 
     def add_ai(self, config: AiConfig) -> "AiManager":
         if config.name in self._ais:
             raise ValueError(f'AI "{config.name}" already exists.')
 
-        if config.type == "google":
-            model = GoogleModel(config)
-        elif config.type == "anthropic":
-            model = AnthropicModel(config)
-        elif config.type == "openai":
-            model = OpenAIModel(config)
-        elif config.type == "ollama":
-            model = OllamaModel(config)
-        else:
+        location = _MODELS.get(config.type)
+        if location is None:
             raise ValueError(f"Unsupported AI type {config.type}.")
 
-        self._ais[config.name] = model
+        module_name, model_class = location
+        mod = importlib.import_module(module_name)
+
+        self._ais[config.name] = getattr(mod, model_class)(config)
 
         return self
 
     def prompt(self, name: str, text: str) -> PromptResult:
-        if name not in self._ais:
+        model = self._ais.get(name)
+        if model is None:
             raise ValueError(f'AI "{name}" does not exist.')
 
-        return self._ais[name].prompt(text)
+        return model.prompt(text)
+
+    def prompt_many(self, names: List[str], text: str) -> Dict[str, PromptResult]:
+        models = {}
+        for name in names:
+            model = self._ais.get(name)
+            if model is None:
+                raise ValueError(f'AI "{name}" does not exist.')
+
+            models[name] = model
+
+        # submit every prompt before waiting on any of them so they run concurrently
+        futures = {
+            name: self._pool.submit(model.prompt, text)
+            for name, model in models.items()
+        }
+
+        return {name: future.result() for name, future in futures.items()}
 
     def remove_ai(self, name: str) -> "AiManager":
-        if name not in self._ais:
+        if self._ais.pop(name, None) is None:
             raise ValueError(f'AI "{name}" does not exist.')
 
-        del self._ais[name]
-
         return self
 
     def register_tools(self, tools: List[ToolInfo]) -> bool:
@@ -69,9 +85,6 @@ class AiManager:
                 future.result()
             except Exception as e:
                 has_error = True
-                message = "".join(
-                    traceback.TracebackException.from_exception(e).format()
-                )
-                self._logger.error(f"Failed to register tools for {name}:\n{message}")
+                self._logger.error("Failed to register tools for %s:", name, exc_info=e)
 
         return not has_error
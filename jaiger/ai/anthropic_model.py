@@ -19,12 +19,19 @@ class AnthropicModel(Model):
         super().__init__()
 
     def prompt(self, text: str) -> PromptResult:
-        self._messages_history.append({"role": "user", "content": text})
-        response = self._client.messages.create(
-            model=self._model, max_tokens=1024, messages=self._messages_history
-        )
-        self._messages_history.append(
-            {"role": response.role, "content": response.content[0].text}
-        )
-
-        return PromptResult.model_validate_json(response)
+        # a single breakpoint on the newest turn lets the provider serve the
+        # rest of the transcript from its prompt cache instead of reprocessing it
+        block = {"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}
+        self._messages_history.append({"role": "user", "content": [block]})
+        try:
+            response = self._client.messages.create(
+                model=self._model, max_tokens=1024, messages=self._messages_history
+            )
+        finally:
+            # earlier prefixes are still matched on lookup, and there is a limit
+            # on how many breakpoints a request may carry
+            del block["cache_control"]
+        content = response.content[0].text
+        self._messages_history.append({"role": response.role, "content": content})
+
+        return PromptResult.model_validate_json(content)
@@ -1,16 +1,29 @@
+from typing import Dict
+
 from google.genai import Client
 
 from jaiger.ai.model import Model
 from jaiger.configs import AiConfig
 from jaiger.models import PromptResult
 
+# models sharing an API key also share a client and its connection pool
+_CLIENTS: Dict[str, Client] = {}
+
+
+def _get_client(api_key: str) -> Client:
+    client = _CLIENTS.get(api_key)
+    if client is None:
+        client = _CLIENTS[api_key] = Client(api_key=api_key)
+
+    return client
+
 
 class GoogleModel(Model):
     def __init__(self, config: AiConfig):
         self._model = config.model
         self._api_key = config.api_key
 
-        self._client = Client(api_key=self._api_key)
+        self._client = _get_client(self._api_key)
         self._chat = self._client.chats.create(model=self._model)
 
         super().__init__()
@@ -1,15 +1,14 @@
-import json
 from abc import ABC, abstractmethod
 from typing import List
 
+from pydantic import TypeAdapter
+
 from jaiger.models import CallResult, PromptResult, ToolCall
 from jaiger.tool.tool_manager import ToolInfo
 from jaiger.utils import get_type_schema
 
-
-class Model(ABC):
-    def __init__(self) -> None:
-        preamble = f"""
+# the schemas are static, so the preamble only needs to be built once
+_PREAMBLE = f"""
         You are a helpful AI assistant who is capable of the following:
         * Responding to prompts ONLY with a JSON object with this type schema: {get_type_schema(PromptResult)}.
         * Breaking down user queries step-by-step and think carefully about how to respond.
@@ -27,14 +26,20 @@ class Model(ABC):
           Each result will be presented as 'CallResult' object of the following schema: {get_type_schema(CallResult)}.
           Upon receiving the 'CallResult' objects you may then proceed to either make further tool call(s) (and expecting further 'CallResult' object(s)) or speak directly to the user.
         """
-        self.prompt(preamble)
+
+_TOOLS_ADAPTER = TypeAdapter(List[ToolInfo])
+
+
+class Model(ABC):
+    def __init__(self) -> None:
+        self.prompt(_PREAMBLE)
 
     @abstractmethod
     def prompt(self, text: str) -> PromptResult:
         pass
 
     def register_tools(self, tools: List[ToolInfo]) -> 'Model':
-        tools_schema = [info.model_dump() for info in tools]
-        self.prompt(f"These tools are now available:\n{json.dumps(tools_schema)}")
+        tools_schema = _TOOLS_ADAPTER.dump_json(tools).decode()
+        self.prompt(f"These tools are now available:\n{tools_schema}")
 
         return self
@@ -1,22 +1,22 @@
-import os
 from typing import Optional
 
-from openai import OpenAI
+from openai import DefaultHttpxClient, OpenAI
 from openai.types.responses import Response
 
 from jaiger.ai.model import Model
 from jaiger.configs import AiConfig
 from jaiger.models import PromptResult
 
+# shared by every OpenAIModel so connections are pooled across instances
+_HTTP_CLIENT = DefaultHttpxClient()
+
 
 class OpenAIModel(Model):
     def __init__(self, config: AiConfig) -> None:
         self._model = config.model
         self._api_key = config.api_key
 
-        os.environ["OPENAI_API_KEY"] = self._api_key
-
-        self._client = OpenAI()
+        self._client = OpenAI(api_key=self._api_key, http_client=_HTTP_CLIENT)
         self._last_response: Optional[Response] = None
 
         super().__init__()
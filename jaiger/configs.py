@@ -1,12 +1,14 @@
 from typing import List, Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class RpcConfig(BaseModel):
     host: str
     port: int
     timeout: int = 10
+    # messages queued per socket and direction before ZeroMQ applies backpressure
+    hwm: int = 1000
 
 
 class HttpConfig(BaseModel):
@@ -28,6 +30,8 @@ class ToolConfig(BaseModel):
     name: str
     type: str
     config: Optional[dict] = None
+    # functions whose results can be reused for identical calls within a prompt
+    memoize: List[str] = Field(default_factory=list)
 
 
 class AiConfig(BaseModel):
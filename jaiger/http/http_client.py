@@ -1,35 +1,50 @@
-import traceback
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 import httpx
 
 from jaiger.configs import HttpConfig
 from jaiger.models import Call, CallResult
 
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
 
 class HttpClient:
     def __init__(self, config: HttpConfig) -> None:
         self._host = config.host
         self._port = config.port
 
+        # keep connections alive across calls instead of reconnecting every time
+        self._client = httpx.Client(
+            base_url=f"http://{self._host}:{self._port}",
+            limits=httpx.Limits(max_keepalive_connections=64),
+        )
+
     def call(
         self,
         function: str,
-        args: List[Any] = list(),
-        kwargs: Dict[str, Any] = dict(),
+        args: Optional[List[Any]] = None,
+        kwargs: Optional[Dict[str, Any]] = None,
         timeout: int = 10,
     ) -> CallResult:
+        args = args or []
+        kwargs = kwargs or {}
+
         try:
-            response = httpx.post(
-                f"http://{self._host}:{self._port}/call",
+            response = self._client.post(
+                "/call",
                 timeout=timeout,
-                json=Call(function=function, args=args, kwargs=kwargs).model_dump(),
+                content=Call(
+                    function=function, args=args, kwargs=kwargs
+                ).model_dump_json(),
+                headers=_JSON_HEADERS,
             )
 
-            return CallResult.model_validate(response.json())
+            return CallResult.model_validate_json(response.content)
 
         except Exception as e:
-            raise RuntimeError(
-                f"Call failed:\n"
-                f"{''.join(traceback.TracebackException.from_exception(e).format())}"
-            )
+            raise RuntimeError(f"Call failed: {e!r}") from e
+
+    def close(self) -> "HttpClient":
+        self._client.close()
+
+        return self
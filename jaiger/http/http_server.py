@@ -1,13 +1,13 @@
-import traceback
 from logging import getLogger
 from threading import Event, Thread
 from typing import Any, Callable, Dict, Optional
 
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 
 from jaiger.configs import HttpConfig
 from jaiger.models import Call, CallResult
+from jaiger.utils import format_error
 
 
 class HttpServer:
@@ -55,8 +55,10 @@ class HttpServer:
         app = FastAPI()
         app.post("/call")(self.call)
 
+        # an in-process uvicorn.Server is always a single worker; requests still
+        # overlap because FastAPI runs the sync call handler in its threadpool
         self._server = uvicorn.Server(
-            uvicorn.Config(app=app, host=self._host, port=self._port, workers=4)
+            uvicorn.Config(app=app, host=self._host, port=self._port)
         )
 
         def run_server(e: Event):
@@ -105,27 +107,36 @@ class HttpServer:
 
         return self
 
-    def call(self, call: Call):
+    def call(self, call: Call) -> Response:
         """
         Handles an incoming HTTP call.
 
         Dispatches the request to the appropriate callback and returns the result.
-        If an error occurs during execution, a formatted traceback is returned.
+        If an error occurs during execution, the formatted exception is returned.
 
         :param call Call: The incoming HTTP call containing function name and arguments.
 
-        :returns: A CallResult object with either a result or an error.
-        :rtype: CallResult
+        :returns: A JSON response of a CallResult with either a result or an error.
+        :rtype: Response
         """
 
-        try:
-            return CallResult(
-                result=self._callbacks[call.function](
-                    *call.args, **call.kwargs
+        callback = self._callbacks.get(call.function)
+        if callback is None:
+            result = CallResult(error=f'Function "{call.function}" does not exist.')
+            content = result.model_dump_json()
+
+        else:
+            try:
+                result = CallResult.model_construct(
+                    result=callback(*call.args, **call.kwargs)
                 )
-            )
+                # serialized inside the try, so a result that cannot be serialized is
+                # answered with the error instead of failing the request
+                content = result.model_dump_json()
 
-        except Exception as e:
-            return CallResult(
-                error="".join(traceback.TracebackException.from_exception(e).format())
-            )
+            except Exception as e:
+                result = CallResult(error=format_error(e))
+                content = result.model_dump_json()
+
+        # serialize directly instead of letting FastAPI run jsonable_encoder on it
+        return Response(content=content, media_type="application/json")
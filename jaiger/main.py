@@ -1,11 +1,12 @@
-import json
-import traceback
 from concurrent.futures import Future
+from functools import lru_cache
 from logging import getLogger
 from logging.config import dictConfig
 from multiprocessing import Event, Pipe
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from pydantic import TypeAdapter
 
 from jaiger.ai.ai_manager import AiManager
 from jaiger.configs import MainConfig
@@ -18,6 +19,38 @@ from jaiger.tool.tool_process import ToolProcess
 from jaiger.utils import get_tool_class
 
 
+_LOGGING_CONFIG = {
+    "version": 1,
+    "formatters": {
+        "default": {"format": "%(asctime)s %(levelname)s [%(name)s] %(message)s"}
+    },
+    "handlers": {
+        "console": {
+            "class": "logging.StreamHandler",
+            "formatter": "default",
+            "level": "DEBUG",
+        }
+    },
+    "loggers": {"jaiger": {"level": "INFO", "handlers": ["console"]}},
+}
+
+_logging_configured = False
+
+_CALL_RESULTS_ADAPTER = TypeAdapter(List[CallResult])
+_TOOL_CALLS_ADAPTER = TypeAdapter(List[ToolCall])
+
+
+@lru_cache(maxsize=8)
+def _validate_config(path: Path, mtime_ns: int) -> MainConfig:
+    return MainConfig.model_validate_json(path.read_bytes())
+
+
+def _load_config(path: Path) -> MainConfig:
+    # each Jaiger gets its own copy, as the cached config is shared and mutable
+    path = path.resolve()
+    return _validate_config(path, path.stat().st_mtime_ns).model_copy(deep=True)
+
+
 class Jaiger:
     """The main class for the Jaiger application, managing AI models, tools, and communication servers."""
 
@@ -36,27 +69,13 @@ class Jaiger:
         if not p.is_file():
             raise FileNotFoundError(f"Failed to load config: {config}")
 
-        self._config = MainConfig.model_validate(json.loads(p.read_text()))
+        self._config = _load_config(p)
 
         # configure logger
-        dictConfig(
-            {
-                "version": 1,
-                "formatters": {
-                    "default": {
-                        "format": "%(asctime)s %(levelname)s [%(name)s] %(message)s"
-                    }
-                },
-                "handlers": {
-                    "console": {
-                        "class": "logging.StreamHandler",
-                        "formatter": "default",
-                        "level": "DEBUG",
-                    }
-                },
-                "loggers": {"jaiger": {"level": "INFO", "handlers": ["console"]}},
-            }
-        )
+        global _logging_configured
+        if not _logging_configured:
+            dictConfig(_LOGGING_CONFIG)
+            _logging_configured = True
 
         self._logger = getLogger("jaiger")
 
@@ -66,8 +85,6 @@ class Jaiger:
             self.ais.__name__: self.ais,
             self.config.__name__: self.config,
             self.tools.__name__: self.tools,
-            self.call_tool.__name__: self.call_tool,
-            self.call_tool_async.__name__: self.call_tool_async,
             self.prompt.__name__: self.prompt,
         }
 
@@ -89,6 +106,12 @@ class Jaiger:
         self._ai_manager = AiManager()
         self._tool_manager = ToolManager()
 
+        self._memoized: Dict[str, Set[str]] = {
+            config.name: set(config.memoize)
+            for config in self._config.tools
+            if config.memoize
+        }
+
     def start(self) -> "Jaiger":
         """
         Starts the Jaiger application, including tool processes and AI model registration.
@@ -184,8 +207,8 @@ class Jaiger:
         self,
         tool: str,
         function: str,
-        args: List[Any] = list(),
-        kwargs: Dict[str, Any] = dict(),
+        args: Optional[List[Any]] = None,
+        kwargs: Optional[Dict[str, Any]] = None,
     ) -> Any:
         """
         Synchronously calls a specific function of a managed tool.
@@ -204,8 +227,8 @@ class Jaiger:
         self,
         tool: str,
         function: str,
-        args: List[Any] = list(),
-        kwargs: Dict[str, Any] = dict(),
+        args: Optional[List[Any]] = None,
+        kwargs: Optional[Dict[str, Any]] = None,
     ) -> Future:
         """
         Asynchronously calls a specific function of a managed tool.
@@ -242,47 +265,71 @@ class Jaiger:
 
         result = self._ai_manager.prompt(name, text)
 
+        # identical calls to memoized functions share one result for the whole prompt
+        reusable: Dict[str, Future] = {}
+
+        def dispatch(call: ToolCall) -> Future:
+            if call.function not in self._memoized.get(call.tool, ()):
+                return self._tool_manager.call_async(
+                    call.tool, call.function, call.args, call.kwargs
+                )
+
+            key = call.model_dump_json()
+            future = reusable.get(key)
+            # only successful results are reused, failed calls are retried
+            if future is None or (future.done() and future.exception() is not None):
+                future = reusable[key] = self._tool_manager.call_async(
+                    call.tool, call.function, call.args, call.kwargs
+                )
+
+            return future
+
         if auto_call:
             while result.calls is not None:
-                call_results = []
                 for call in result.calls:
                     if on_call is not None:
                         try:
                             on_call(call)
                         except Exception as e:
                             self._logger.error(
-                                "Error when calling on_call hook:\n"
-                                f"{''.join(traceback.TracebackException.from_exception(e).format())}"
+                                "Error when calling on_call hook:", exc_info=e
                             )
+
+                # dispatch every call up front so independent tools run concurrently
+                futures = [dispatch(call) for call in result.calls]
+
+                call_results = []
+                for call, future in zip(result.calls, futures):
+                    # results are produced by our own tools, so validation can be skipped
                     try:
-                        result = CallResult(
-                            result=self._tool_manager.call(
-                                call.tool, call.function, call.args, call.kwargs
-                            ),
-                            error=None,
+                        call_result = CallResult.model_construct(
+                            result=future.result(), error=None
                         )
 
                     except Exception as e:
-                        result = CallResult(result=None, error=repr(e))
+                        call_result = CallResult.model_construct(
+                            result=None, error=repr(e)
+                        )
 
                     if on_result is not None:
                         try:
-                            on_result(call, result)
+                            on_result(call, call_result)
                         except Exception as e:
                             self._logger.error(
-                                "Error when calling on_result hook:\n"
-                                f"{''.join(traceback.TracebackException.from_exception(e).format())}"
+                                "Error when calling on_result hook:", exc_info=e
                             )
 
-                    call_results.append(result.model_dump())
+                    call_results.append(call_result)
 
-                result = self._ai_manager.prompt(name, json.dumps(call_results))
+                result = self._ai_manager.prompt(
+                    name, _CALL_RESULTS_ADAPTER.dump_json(call_results).decode()
+                )
 
             return result.text
 
         else:
             ret = result.text
             if ret is None:
-                ret = json.dumps([call.model_dump() for call in result.calls])
+                ret = _TOOL_CALLS_ADAPTER.dump_json(result.calls).decode()
 
             return ret
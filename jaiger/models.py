@@ -1,12 +1,12 @@
 from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class Call(BaseModel):
     function: str
-    args: List[Any] = list()
-    kwargs: Dict[str, Any] = dict()
+    args: List[Any] = Field(default_factory=list)
+    kwargs: Dict[str, Any] = Field(default_factory=dict)
 
 
 class CallResult(BaseModel):
@@ -17,8 +17,8 @@ class CallResult(BaseModel):
 class ToolCall(BaseModel):
     tool: str
     function: str
-    args: List[Any] = list()
-    kwargs: Dict[str, Any] = dict()
+    args: List[Any] = Field(default_factory=list)
+    kwargs: Dict[str, Any] = Field(default_factory=dict)
 
 
 class PromptResult(BaseModel):
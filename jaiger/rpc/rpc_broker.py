@@ -1,6 +1,6 @@
-import time
-from logging import getLogger
-from multiprocessing import Event, Process
+import secrets
+from logging import DEBUG, getLogger
+from multiprocessing import Event, Process, Value
 from typing import Optional
 
 import zmq
@@ -8,37 +8,65 @@ import zmq
 from jaiger.configs import RpcConfig
 
 
-def broker_task(endpoint: str, start_event: Event, stop_event: Event):
+def broker_task(
+    endpoint: str,
+    hwm: int,
+    control_port: Value,
+    control_token: bytes,
+    start_event: Event,
+):
     """
     A broker loop that routes messages between RPC clients and servers using ZeroMQ ROUTER sockets.
 
     This function is intended to be run as a background process. It listens for incoming multipart
     messages and forwards them to their destinations based on the envelope routing format.
+    The loop blocks until a message arrives and exits once its control token is received on its control socket.
 
     :param endpoint str: The ZeroMQ endpoint to bind to (e.g., "tcp://localhost:5555").
+    :param hwm int: The send and receive high water marks of the routing socket.
+    :param control_port Value: A shared integer the broker fills in with the port of its control socket.
+    :param control_token bytes: The secret a stop message must carry, so that other local processes cannot stop the broker.
     :param start_event Event: A multiprocessing event used to signal that the broker has started.
-    :param stop_event Event: A multiprocessing event used to signal the broker to stop running.
     """
 
-    start_event.set()
-
-    context = zmq.Context()
+    context = zmq.Context.instance()
     socket = context.socket(zmq.ROUTER)
+    socket.setsockopt(zmq.SNDHWM, hwm)
+    socket.setsockopt(zmq.RCVHWM, hwm)
     socket.bind(endpoint)
 
+    control = context.socket(zmq.PULL)
+    control_port.value = control.bind_to_random_port("tcp://127.0.0.1")
+
     poller = zmq.Poller()
     poller.register(socket, zmq.POLLIN)
+    poller.register(control, zmq.POLLIN)
 
     logger = getLogger("jaiger")
+    # logging is configured before the loop starts, so the level only needs checking once
+    debug = logger.isEnabledFor(DEBUG)
+
+    start_event.set()
+
+    running = True
+    while running:
+        # only POLLIN is registered, so every entry returned is a readable socket
+        for item, _ in poller.poll():
+            if item is control:
+                if control.recv() == control_token:
+                    running = False
+                    break
 
-    while not stop_event.is_set():
-        sockets = dict(poller.poll(1))
-        if sockets[socket] == zmq.POLLIN:
-            src, dst, content = socket.recv_multipart()
-            logger.debug(f"Routing [{src}] > [{dst}]: {content}")
-            socket.send_multipart([dst, src, content])
+                continue
 
-        time.sleep(0)
+            # frames are forwarded as libzmq buffers without being copied into bytes
+            frames = socket.recv_multipart(copy=False)
+            if debug:
+                src, dst, *content = (frame.bytes for frame in frames)
+                logger.debug(f"Routing [{src}] > [{dst}]: {content}")
+
+            frames[0], frames[1] = frames[1], frames[0]
+            socket.send_multipart(frames, copy=False)
 
     context.destroy(0)
 
@@ -63,16 +91,18 @@ class RpcBroker:
 
         self._endpoint = f"tcp://{config.host}:{config.port}"
         self._timeout = config.timeout
+        self._hwm = config.hwm
 
         self._task: Optional[Process] = None
-        self._stop_event: Optional[Event] = None
+        self._control_port: Optional[Value] = None
+        self._control_token: Optional[bytes] = None
 
     def start(self) -> 'RpcBroker':
         """
         Starts the RPC broker in a background process.
 
         If a broker process is already running, it is first terminated before starting a new one.
-        Uses multiprocessing events to coordinate startup and shutdown signaling.
+        Waits until the broker has bound its sockets before returning.
 
         :returns: The instance itself for chaining.
         :rtype: RpcBroker
@@ -86,17 +116,25 @@ class RpcBroker:
             self.stop()
 
         start_event = Event()
-        self._stop_event = Event()
+        self._control_port = Value("i", 0)
+        self._control_token = secrets.token_bytes(16)
         self._task = Process(
             target=broker_task,
-            args=(self._endpoint, start_event, self._stop_event),
+            args=(
+                self._endpoint,
+                self._hwm,
+                self._control_port,
+                self._control_token,
+                start_event,
+            ),
             daemon=True,
         )
         self._task.start()
 
-        start_event.wait()
-
-        logger.info(f"Broker process ({self._task.pid}) has started.")
+        if start_event.wait(timeout=self._timeout):
+            logger.info(f"Broker process ({self._task.pid}) has started.")
+        else:
+            logger.warning(f"Broker process ({self._task.pid}) failed to start.")
 
         return self
 
@@ -104,7 +142,8 @@ class RpcBroker:
         """
         Stops the RPC broker process gracefully.
 
-        Waits for the background process to terminate within the configured timeout period.
+        Sends the broker its control token through its control socket, then waits for the background process
+        to terminate within the configured timeout period.
         Logs whether the termination was successful or if the process remained alive.
 
         :returns: The instance itself for chaining.
@@ -112,7 +151,13 @@ class RpcBroker:
         """
 
         if self._task is not None:
-            self._stop_event.set()
+            # the port stays 0 if the broker never got as far as binding it
+            if self._control_port.value != 0:
+                context = zmq.Context.instance()
+                control = context.socket(zmq.PUSH)
+                control.connect(f"tcp://127.0.0.1:{self._control_port.value}")
+                control.send(self._control_token)
+                control.close(linger=self._timeout * 1000)
 
             self._task.join(timeout=self._timeout)
 
@@ -123,6 +168,7 @@ class RpcBroker:
                 logger.info(f"Broker task ({self._task.pid}) has been terminated.")
 
             self._task = None
-            self._stop_event = None
+            self._control_port = None
+            self._control_token = None
 
         return self
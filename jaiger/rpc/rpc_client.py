@@ -1,11 +1,22 @@
-from concurrent.futures import Future, ThreadPoolExecutor
-from logging import getLogger
-from typing import Any, Dict, List, Optional
+import heapq
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from logging import DEBUG, getLogger
+from queue import Empty, SimpleQueue
+from threading import Event, Lock, Thread
+from time import monotonic
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import uuid4
 
 import zmq
 
 from jaiger.configs import RpcConfig
 from jaiger.models import Call, CallResult
+from jaiger.rpc.rpc_waker import RpcWaker
+from jaiger.utils import describe_call
+
+# (server_id, function, args, kwargs) of a call, kept to describe it in errors
+_CallInfo = Tuple[str, str, List[Any], Dict[str, Any]]
 
 
 class RpcClient:
@@ -14,6 +25,9 @@ class RpcClient:
 
     This client uses the DEALER socket pattern and supports both blocking (`call`) and non-blocking (`call_async`)
     method invocation. The client can be configured with connection settings and timeout behavior through `RpcConfig`.
+
+    A single reader thread owns the socket: it sends queued requests and resolves the future of each
+    response by the correlation id that travels alongside the request, so any number of calls can be in flight at once.
     """
 
     def __init__(self, config: RpcConfig) -> None:
@@ -25,31 +39,42 @@ class RpcClient:
 
         self._endpoint = f"tcp://{config.host}:{config.port}"
         self._timeout = config.timeout
+        self._hwm = config.hwm
 
-        self._pool: Optional[ThreadPoolExecutor] = None
-
-        self._context: Optional[zmq.Context] = None
-        self._socket: Optional[zmq.Socket] = None
-        self._poller: Optional[zmq.Poller] = None
+        self._reader: Optional[Thread] = None
+        self._stop_event: Optional[Event] = None
+        self._outbox: Optional[SimpleQueue] = None
+        self._waker: Optional[RpcWaker] = None
+        # queueing a call must not interleave with the reader draining the outbox on
+        # exit, nor with disconnect() tearing the connection down
+        self._lock = Lock()
 
         self._logger = getLogger("jaiger")
 
     def connect(self) -> "RpcClient":
         """
-        Establishes a connection to the RPC server by initializing the socket, context, and poller.
+        Establishes a connection to the RPC server by starting the reader thread that owns the socket.
 
         :returns: The instance itself, allowing method chaining.
         :rtype: RpcClient
         """
 
-        if self._context is not None:
+        if self._reader is not None:
             self.disconnect()
 
-        self._pool = ThreadPoolExecutor()
-        self._context = zmq.Context()
-        self._socket = self._context.socket(zmq.DEALER)
-        self._poller = zmq.Poller()
-        self._poller.register(self._socket, zmq.POLLIN)
+        with self._lock:
+            self._stop_event = Event()
+            self._outbox = SimpleQueue()
+
+            # lets callers wake the reader thread out of its poll when a call is queued
+            self._waker = RpcWaker()
+
+            self._reader = Thread(
+                target=self._read_responses,
+                args=(self._outbox, self._waker, self._stop_event),
+                daemon=True,
+            )
+            self._reader.start()
 
         return self
 
@@ -57,18 +82,36 @@ class RpcClient:
         """
         Closes the connection to the RPC server and cleans up resources.
 
+        Calls that are still waiting for a response fail with a RuntimeError.
+
         :returns: The instance itself, allowing method chaining.
         :rtype: RpcClient
         """
 
-        if self._context is not None:
-            self._pool.shutdown(wait=True)
-            self._context.destroy(0)
+        with self._lock:
+            reader = self._reader
+            if reader is None:
+                return self
+
+            # calls are refused from here on, so none can be queued behind the drain
+            self._stop_event.set()
+            self._waker.wake()
+
+        # joined without the lock, which the reader takes to drain the outbox
+        reader.join(timeout=self._timeout)
+        if reader.is_alive():
+            self._logger.warning(
+                f"RPC client reader ({reader.name}) is not terminated."
+            )
+
+        with self._lock:
+            if self._reader is reader:
+                self._waker.close()
 
-            self._pool = None
-            self._context = None
-            self._socket = None
-            self._poller = None
+                self._reader = None
+                self._stop_event = None
+                self._outbox = None
+                self._waker = None
 
         return self
 
@@ -76,8 +119,8 @@ class RpcClient:
         self,
         server_id: str,
         function: str,
-        args: List[Any] = list(),
-        kwargs: Dict[str, Any] = dict(),
+        args: Optional[List[Any]] = None,
+        kwargs: Optional[Dict[str, Any]] = None,
         timeout: int = 10,
     ) -> Any:
         """
@@ -96,17 +139,21 @@ class RpcClient:
         :raises TimeoutError: If the response is not received within the timeout period.
         """
 
-        request = Call(function=function, args=args, kwargs=kwargs)
-        self._socket.send_multipart([server_id, request.model_dump()])
+        future = self.call_async(server_id, function, args, kwargs, timeout)
 
-        return self._wait_for_response(server_id, function, args, kwargs, timeout)
+        # the reader times the call out, so this only guards against it having stopped
+        try:
+            return future.result(timeout=timeout + 1)
+        except FutureTimeoutError:
+            call = (server_id, function, args or [], kwargs or {})
+            raise TimeoutError(f"Timeout when calling {describe_call(*call)}") from None
 
     def call_async(
         self,
         server_id: str,
         function: str,
-        args: List[Any] = list(),
-        kwargs: Dict[str, Any] = dict(),
+        args: Optional[List[Any]] = None,
+        kwargs: Optional[Dict[str, Any]] = None,
         timeout: int = 10,
     ) -> Future:
         """
@@ -120,45 +167,152 @@ class RpcClient:
 
         :returns: A future representing the pending result of the RPC call.
         :rtype: Future
-        """
-
-        request = Call(function=function, args=args, kwargs=kwargs)
-        self._socket.send_multipart([server_id, request.model_dump()])
 
-        return self._pool.submit(
-            self._wait_for_response, server_id, function, args, kwargs, timeout
-        )
+        :raises RuntimeError: If the client is not connected or its reader has stopped.
+        """
 
-    def _wait_for_response(
-        self,
-        server_id: str,
-        function: str,
-        args: List[Any],
-        kwargs: Dict[str, Any],
-        timeout_s: int,
-    ) -> Any:
-        items = dict(self._poller.poll(timeout_s * 1000))
-        if items.get(self._socket) == zmq.POLLIN:
-            src, content = self._socket.recv_multipart()
-
-            self._logger.debug(f"Received from [{src}]: {content}")
-
-            response = CallResult.model_validate(content)
-
-            if response.error == "":
-                return response.result
-            else:
-                raise RuntimeError(
-                    f"Error when calling {server_id}:\n"
-                    f"> function: {function}\n"
-                    f"> args: {args}\n"
-                    f"> kwargs: {kwargs}\n"
-                    f"Error message:\n{response.error}"
+        args = args or []
+        kwargs = kwargs or {}
+
+        # the arguments are sent as given and validated by the server on receipt
+        request = Call.model_construct(function=function, args=args, kwargs=kwargs)
+
+        future = Future()
+        with self._lock:
+            if self._reader is None:
+                raise RuntimeError("RPC client is not connected.")
+
+            # set on disconnect and by the reader on exit, after which nothing would
+            # send the call
+            if self._stop_event.is_set():
+                raise RuntimeError("RPC client is disconnected.")
+
+            self._outbox.put(
+                (
+                    [
+                        server_id.encode(),
+                        uuid4().bytes,
+                        request.model_dump_json().encode(),
+                    ],
+                    monotonic() + timeout,
+                    future,
+                    (server_id, function, args, kwargs),
+                )
+            )
+            self._waker.wake()
+
+        return future
+
+    def _read_responses(
+        self, outbox: SimpleQueue, waker: RpcWaker, stop_event: Event
+    ) -> None:
+        # the process-wide context is shared with every other client, so only the
+        # socket is closed when the reader exits
+        sock = zmq.Context.instance().socket(zmq.DEALER)
+        sock.setsockopt(zmq.SNDHWM, self._hwm)
+        sock.setsockopt(zmq.RCVHWM, self._hwm)
+        sock.connect(self._endpoint)
+
+        poller = zmq.Poller()
+        poller.register(sock, zmq.POLLIN)
+        poller.register(waker, zmq.POLLIN)
+
+        pending: Dict[bytes, Tuple[Future, _CallInfo]] = {}
+        deadlines: List[Tuple[float, bytes]] = []
+
+        try:
+            while not stop_event.is_set():
+                timeout = (
+                    max(0.0, (deadlines[0][0] - monotonic()) * 1000)
+                    if deadlines
+                    else None
+                )
+                for item, _ in poller.poll(timeout):
+                    if item is not sock:
+                        waker.drain()
+                        continue
+
+                    # a malformed message only fails its own call, never the reader
+                    frames = sock.recv_multipart()
+                    if len(frames) != 3:
+                        self._logger.warning(f"Received a malformed response: {frames}")
+                        continue
+
+                    src, correlation_id, content = frames
+                    if self._logger.isEnabledFor(DEBUG):
+                        self._logger.debug(f"Received from [{src}]: {content}")
+
+                    entry = pending.pop(correlation_id, None)
+                    if entry is None:
+                        # the call has already timed out
+                        continue
+
+                    future, call = entry
+                    try:
+                        response = CallResult.model_validate_json(content)
+                    except ValueError as e:
+                        future.set_exception(
+                            RuntimeError(
+                                f"Invalid response when calling {describe_call(*call)}"
+                                f"Error message:\n{e}"
+                            )
+                        )
+                        continue
+
+                    if response.error is None:
+                        future.set_result(response.result)
+                    else:
+                        future.set_exception(
+                            RuntimeError(
+                                f"Error when calling {describe_call(*call)}"
+                                f"Error message:\n{response.error}"
+                            )
+                        )
+
+                while True:
+                    try:
+                        frames, deadline, future, call = outbox.get_nowait()
+                    except Empty:
+                        break
+
+                    if not future.set_running_or_notify_cancel():
+                        continue
+
+                    pending[frames[1]] = (future, call)
+                    heapq.heappush(deadlines, (deadline, frames[1]))
+                    # large payloads are handed to libzmq without a copy
+                    sock.send_multipart(frames, copy=False)
+
+                now = monotonic()
+                while deadlines and deadlines[0][0] <= now:
+                    _, correlation_id = heapq.heappop(deadlines)
+                    entry = pending.pop(correlation_id, None)
+                    if entry is not None:
+                        future, call = entry
+                        future.set_exception(
+                            TimeoutError(f"Timeout when calling {describe_call(*call)}")
+                        )
+
+        finally:
+            unanswered = list(pending.values())
+
+            # refuses new calls, as there is no reader left to send them; under the
+            # lock, every call is either refused or already queued to be drained here
+            with self._lock:
+                stop_event.set()
+
+                while True:
+                    try:
+                        _, _, future, call = outbox.get_nowait()
+                    except Empty:
+                        break
+
+                    if future.set_running_or_notify_cancel():
+                        unanswered.append((future, call))
+
+            for future, call in unanswered:
+                future.set_exception(
+                    RuntimeError(f"Disconnected while calling {describe_call(*call)}")
                 )
 
-        raise TimeoutError(
-            f"Timeout when calling {server_id}:\n"
-            f"> function: {function}\n"
-            f"> args: {args}\n"
-            f"> kwargs: {kwargs}\n"
-        )
+            sock.close(0)
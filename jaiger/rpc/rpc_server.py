@@ -1,101 +1,169 @@
-import time
-import traceback
-from concurrent.futures import Future, ThreadPoolExecutor
-from logging import getLogger
+import os
+from logging import DEBUG, getLogger
+from queue import Empty, SimpleQueue
 from threading import Event, Thread
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Optional
 
 import zmq
 
 from jaiger.configs import RpcConfig
 from jaiger.models import Call, CallResult
+from jaiger.rpc.rpc_waker import RpcWaker
+from jaiger.utils import format_error
+
+
+def _serialize_reply(result: Any, error: Optional[Exception]) -> bytes:
+    try:
+        return (
+            CallResult.model_construct(
+                result=result,
+                error=format_error(error) if error is not None else None,
+            )
+            .model_dump_json()
+            .encode()
+        )
+    except Exception as e:
+        # a result that cannot be serialized is answered with the error instead
+        return _serialize_reply(None, e)
 
 
 def server_task(
     id: str,
     callbacks: Dict[str, Callable[[Any], Any]],
     endpoint: str,
+    hwm: int,
     start_event: Event,
     stop_event: Event,
+    waker: RpcWaker,
 ):
     """
     A background task that acts as an RPC server using ZeroMQ DEALER sockets.
 
-    The server listens for incoming requests, dispatches them to the corresponding callback functions
-    asynchronously using a thread pool, and sends back the results or error traces.
+    The server listens for incoming requests and queues them on a SimpleQueue, from which a fixed set
+    of worker threads call the corresponding callback functions. Completed requests are handed back to
+    this loop, which sends back the results or error messages.
 
     :param id str: Unique identifier for the server (used as ZeroMQ identity).
     :param callbacks Dict[str, Callable[[Any], Any]]: Mapping of function names to their handler callables.
     :param endpoint str: ZeroMQ endpoint to connect to (e.g., "tcp://localhost:5555").
+    :param hwm int: Send and receive high water marks of the DEALER socket.
     :param start_event Event: Event used to signal that the server has started.
     :param stop_event Event: Event used to stop the server gracefully.
+    :param waker RpcWaker: Waker polled alongside the DEALER socket, woken when a request completes or the server is stopped.
     """
 
     start_event.set()
 
-    def separate_completed_futures(
-        futures: List[Tuple[str, Future]],
-    ) -> Tuple[List[Tuple[str, Future]], List[Tuple[str, Future]]]:
-        completed = []
-        not_completed = []
-        for f in futures:
-            if f[1].done():
-                completed.append(f)
-            else:
-                not_completed.append(f)
-
-        return completed, not_completed
-
-    context = zmq.Context()
-    socket = context.socket(zmq.DEALER)
-    socket.setsockopt_string(zmq.IDENTITY, id)
-    socket.connect(endpoint)
+    # the process-wide context is shared with the clients, so only the socket is
+    # closed when the server exits
+    dealer = zmq.Context.instance().socket(zmq.DEALER)
+    dealer.setsockopt_string(zmq.IDENTITY, id)
+    dealer.setsockopt(zmq.SNDHWM, hwm)
+    dealer.setsockopt(zmq.RCVHWM, hwm)
+    dealer.connect(endpoint)
 
     poller = zmq.Poller()
-    poller.register(socket, zmq.POLLIN)
+    poller.register(dealer, zmq.POLLIN)
+    poller.register(waker, zmq.POLLIN)
 
     logger = getLogger("jaiger")
 
-    pool = ThreadPoolExecutor()
+    # (source, correlation id, callback, args, kwargs) of the requests to be handled
+    requests: SimpleQueue = SimpleQueue()
+    # (source, correlation id, serialized reply) of the requests that have been handled
+    completed: SimpleQueue = SimpleQueue()
+
+    def complete(src: bytes, correlation_id: bytes, reply: bytes) -> None:
+        completed.put((src, correlation_id, reply))
+        # nobody is left to reply once the server is stopping
+        if not stop_event.is_set():
+            waker.wake()
+
+    def work() -> None:
+        while True:
+            item = requests.get()
+            if item is None:
+                return
+
+            # replies are serialized here as well, so the server loop only sends them
+            src, correlation_id, function, args, kwargs = item
+            try:
+                result = function(*args, **kwargs)
+            except Exception as e:
+                complete(src, correlation_id, _serialize_reply(None, e))
+            else:
+                complete(src, correlation_id, _serialize_reply(result, None))
 
-    futures: List[Tuple[str, Future]] = []
+    # a fixed set of workers fed from a queue, sized like ThreadPoolExecutor's default,
+    # so handing over a request needs neither a Future nor a done callback
+    workers = [
+        Thread(target=work, daemon=True)
+        for _ in range(min(32, (os.cpu_count() or 1) + 4))
+    ]
+    for worker in workers:
+        worker.start()
 
     while not stop_event.is_set():
-        sockets = dict(poller.poll(1))
-        if sockets[socket] == zmq.POLLIN:
-            src, content = socket.recv_multipart()
-            logger.debug(f"RPC Server [{id}] from [{src}]: {content}")
+        # completions wake the poll as well, so it can block until there is work
+        for item, _ in poller.poll():
+            if item is not dealer:
+                waker.drain()
+
+        # drain every queued request without polling first, so a burst is taken at once
+        while True:
+            try:
+                src, correlation_id, content = dealer.recv_multipart(
+                    flags=zmq.NOBLOCK
+                )
+            except zmq.Again:
+                break
+
+            if logger.isEnabledFor(DEBUG):
+                logger.debug(f"RPC Server [{id}] from [{src}]: {content}")
 
             try:
-                request = Call.model_validate(content)
-                futures.append(
-                    pool.submit(
-                        callbacks[request.function], *request.args, **request.kwargs
+                request = Call.model_validate_json(content)
+                requests.put(
+                    (
+                        src,
+                        correlation_id,
+                        callbacks[request.function],
+                        request.args,
+                        request.kwargs,
                     )
                 )
 
             except Exception as e:
+                # the traceback is only formatted if the record is emitted
                 logger.info(
-                    f"Server {id} failed to handle RPC request {request}:"
-                    f"{''.join(traceback.TracebackException.from_exception(e).format())}"
+                    "Server %s failed to handle RPC request %s:",
+                    id,
+                    content,
+                    exc_info=e,
                 )
 
-            completed, futures = separate_completed_futures(futures)
-            for src, future in completed:
-                error = future.exception()
-                content = CallResult(
-                    result=future.result() if error is None else None,
-                    error="".join(
-                        traceback.TracebackException.from_exception(error).format()
-                    )
-                    if error is not None
-                    else "",
-                )
-                socket.send_multipart([src, content.model_dump()])
+                # answer with the error instead of leaving the caller to time out
+                complete(src, correlation_id, _serialize_reply(None, e))
 
-        time.sleep(0)
+        while True:
+            try:
+                src, correlation_id, reply = completed.get_nowait()
+            except Empty:
+                break
 
-    context.destroy(0)
+            # pyzmq still copies frames under zmq.COPY_THRESHOLD, so only large
+            # results are handed to libzmq without a copy
+            try:
+                dealer.send_multipart([src, correlation_id, reply], copy=False)
+            except zmq.ZMQError as e:
+                # one undeliverable reply must not stop the server
+                logger.warning(f"Server {id} failed to send RPC reply: {e!r}")
+
+    # workers still busy with a request finish it before picking up their sentinel
+    for _ in workers:
+        requests.put(None)
+
+    dealer.close(0)
 
     logger.debug(f"Server task {id} exitting ...")
 
@@ -119,9 +187,11 @@ class RpcServer:
         self._callbacks = callbacks
         self._endpoint = f"tcp://{config.host}:{config.port}"
         self._timeout = config.timeout
+        self._hwm = config.hwm
 
         self._task: Optional[Thread] = None
         self._stop_event: Optional[Event] = None
+        self._waker: Optional[RpcWaker] = None
 
     def start(self) -> "RpcServer":
         """
@@ -141,14 +211,17 @@ class RpcServer:
 
         start_event = Event()
         self._stop_event = Event()
+        self._waker = RpcWaker()
         self._task = Thread(
             target=server_task,
             args=(
                 self._id,
                 self._callbacks,
                 self._endpoint,
+                self._hwm,
                 start_event,
                 self._stop_event,
+                self._waker,
             ),
             daemon=True,
         )
@@ -170,6 +243,7 @@ class RpcServer:
 
         if self._task is not None:
             self._stop_event.set()
+            self._waker.wake()
 
             self._task.join(timeout=self._timeout)
 
@@ -179,7 +253,10 @@ class RpcServer:
             else:
                 logger.info(f"Server task ({self._task.name}) has been terminated.")
 
+            self._waker.close()
+
             self._task = None
             self._stop_event = None
+            self._waker = None
 
         return self
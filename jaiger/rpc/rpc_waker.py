@@ -0,0 +1,36 @@
+from socket import socketpair
+
+
+class RpcWaker:
+    """
+    A socket pair that wakes a thread blocked in a ZeroMQ poll from any other thread.
+
+    The waker is registered with the poller alongside the ZeroMQ socket. The poller
+    reports it by its file descriptor rather than as the waker itself.
+    """
+
+    def __init__(self) -> None:
+        self._r, self._w = socketpair()
+        self._r.setblocking(False)
+        self._w.setblocking(False)
+
+    def fileno(self) -> int:
+        return self._r.fileno()
+
+    def wake(self) -> None:
+        try:
+            self._w.send(b"\0")
+        except OSError:
+            # either unread wake-ups are already pending, so the poll will return
+            # anyway, or the waker has been closed and nobody is polling it
+            pass
+
+    def drain(self) -> None:
+        try:
+            self._r.recv(4096)
+        except BlockingIOError:
+            pass
+
+    def close(self) -> None:
+        self._r.close()
+        self._w.close()
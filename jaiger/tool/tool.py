@@ -1,6 +1,7 @@
 import inspect
 from abc import ABC
-from typing import List, Optional
+from functools import lru_cache
+from typing import List, Optional, Tuple
 
 from docstring_parser import parse
 from pydantic import BaseModel
@@ -43,7 +44,7 @@ class Tool(ABC):
         return self._config
 
     def specs(self) -> List[ToolSpec]:
-        return self._specs
+        return list(self._specs)
 
     def setup(self):
         pass
@@ -51,12 +52,16 @@ class Tool(ABC):
     def teardown(self):
         pass
 
-    def _get_specs(self) -> List[ToolSpec]:
+    # the specs only depend on the class, so they are inspected once per tool class and
+    # kept immutable, as every instance shares them
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _get_specs(cls) -> Tuple[ToolSpec, ...]:
         base_methods = [
-            self.config.__name__,
-            self.specs.__name__,
-            self.setup.__name__,
-            self.teardown.__name__,
+            cls.config.__name__,
+            cls.specs.__name__,
+            cls.setup.__name__,
+            cls.teardown.__name__,
         ]
 
         def is_public_method_of_child_class(member):
@@ -69,14 +74,14 @@ class Tool(ABC):
         docstrings = (
             (name, parse(member.__doc__))
             for name, member in inspect.getmembers(
-                self, predicate=is_public_method_of_child_class
+                cls, predicate=is_public_method_of_child_class
             )
         )
 
-        return [
+        return tuple(
             ToolSpec(
                 name=name,
-                description=self.__doc__,
+                description=cls.__doc__,
                 params=[
                     ToolParam(
                         name=param.arg_name,
@@ -98,4 +103,4 @@ class Tool(ABC):
                 ],
             )
             for name, docstring in docstrings
-        ]
+        )
@@ -1,13 +1,17 @@
-from concurrent.futures import Future, ThreadPoolExecutor
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, as_completed
 from logging import getLogger
-from multiprocessing.connection import Connection
-from typing import Any, Dict, List, Tuple
+from multiprocessing.connection import Connection, wait
+from threading import Event, Lock, Thread
+from time import monotonic
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple, Union
 
 from pydantic import BaseModel
 
-from jaiger.models import Call, CallResult
+from jaiger.models import Call
 from jaiger.tool.tool import Tool, ToolSpec
-from jaiger.tool.tool_process import ToolProcess
+from jaiger.tool.tool_process import ToolProcess, ToolReply, ToolRequest
+from jaiger.utils import describe_call
 
 
 class ToolInfo(BaseModel):
@@ -15,28 +19,69 @@ class ToolInfo(BaseModel):
     specs: List[ToolSpec]
 
 
+class ToolCallError(RuntimeError):
+    def __init__(
+        self,
+        tool: str,
+        function: str,
+        args: List[Any],
+        kwargs: Dict[str, Any],
+        error: str,
+    ) -> None:
+        super().__init__(tool, function, args, kwargs, error)
+
+    def __str__(self) -> str:
+        # the message embeds the arguments, so it is only formatted once it is shown
+        tool, function, args, kwargs, error = self.args
+        return (
+            f"Error when calling {_describe(tool, (function, args, kwargs))}"
+            f"Error message:\n{error}"
+        )
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({str(self)!r})"
+
+
+def _describe(tool: str, request: Union[ToolRequest, List[ToolRequest]]) -> str:
+    if isinstance(request, list):
+        return f"{tool}:\n> batch of {len(request)} calls\n"
+
+    return describe_call(tool, *request)
+
+
 class ToolManager:
-    def __init__(self):
+    def __init__(self, executor: Optional[Executor] = None):
         self._conns: Dict[str, Connection] = {}
+        # a tool answers its calls in the order they were sent, so sending a request
+        # and queueing its future must not interleave with another thread's
+        self._locks: Dict[str, Lock] = {}
         self._processes: Dict[str, ToolProcess] = {}
+        # (future, request) of the calls still waiting for their result
+        self._pending: Dict[
+            str, Deque[Tuple[Future, Union[ToolRequest, List[ToolRequest]]]]
+        ] = {}
+        self._readers: Dict[str, Thread] = {}
+        # set by a reader once its tool has exited and its pending calls have failed
+        self._stopped: Dict[str, Event] = {}
+        # specs do not change while a tool runs, so each tool is only asked once
+        self._tool_infos: Dict[str, ToolInfo] = {}
 
-        self._pool = ThreadPoolExecutor()
+        # calls are resolved by the readers, so the pool only starts processes
+        self._pool = executor or ThreadPoolExecutor(thread_name_prefix="jaiger-tool")
 
         self._logger = getLogger("jaiger")
 
     def tools(self) -> List[ToolInfo]:
-        def get_tool_info(name: str, conn: Connection) -> ToolInfo:
-            conn.send(Call(function=Tool.specs.__name__))
-            result: CallResult = conn.recv()
+        futures = {
+            name: self.call_async(name, Tool.specs.__name__)
+            for name in self._conns
+            if name not in self._tool_infos
+        }
 
-            return ToolInfo(name=name, specs=result.result)
+        for name, future in futures.items():
+            self._tool_infos[name] = ToolInfo(name=name, specs=future.result())
 
-        return [
-            tool_info
-            for tool_info in self._pool.map(
-                lambda kv: get_tool_info(kv[0], kv[1]), self._conns.items()
-            )
-        ]
+        return [self._tool_infos[name] for name in self._conns]
 
     def start(
         self, name: str, conn: Connection, tool_process: ToolProcess
@@ -45,8 +90,12 @@ class ToolManager:
             raise ValueError(f'Tool named "{name}" already exists!')
         else:
             self._conns[name] = conn
+            self._locks[name] = Lock()
             self._processes[name] = tool_process
+            self._pending[name] = deque()
+            self._stopped[name] = Event()
             tool_process.start()
+            self._start_reader(name)
 
         return self
 
@@ -54,17 +103,30 @@ class ToolManager:
         self, args: List[Tuple[str, Connection, ToolProcess]]
     ) -> "ToolManager":
         processes = []
+        # validated in full before anything is registered
+        names: Set[str] = set()
         for name, _, _ in args:
             if name in self._conns:
                 raise ValueError(f'Tool named "{name}" already exists!')
+            if name in names:
+                raise ValueError(f'Tool named "{name}" is given more than once!')
+
+            names.add(name)
 
         for name, conn, tool_process in args:
             self._conns[name] = conn
+            self._locks[name] = Lock()
             self._processes[name] = tool_process
+            self._pending[name] = deque()
+            self._stopped[name] = Event()
             processes.append(tool_process)
 
-        for _ in self._pool.map(lambda p: p.start(), processes):
-            pass
+        # a failure surfaces as soon as it happens rather than in submission order
+        for future in as_completed([self._pool.submit(p.start) for p in processes]):
+            future.result()
+
+        for name, _, _ in args:
+            self._start_reader(name)
 
         return self
 
@@ -82,33 +144,55 @@ class ToolManager:
                 )
 
             del self._conns[name]
+            del self._locks[name]
             del self._processes[name]
+            del self._pending[name]
+            del self._readers[name]
+            del self._stopped[name]
+            self._tool_infos.pop(name, None)
 
         return self
 
     def stop_many(self, names: List[str]) -> "ToolManager":
+        # validated in full before anything is stopped
+        seen: Set[str] = set()
         for name in names:
             if name not in self._conns:
                 raise ValueError(f'Tool named "{name}" does not exist!')
+            if name in seen:
+                raise ValueError(f'Tool named "{name}" is given more than once!')
 
-        def stop_process(process: ToolProcess):
-            process = self._processes[name]
-            process.stop()
-            process.join(timeout=10)
+            seen.add(name)
 
-            if process.is_alive():
-                self._logger.warning(
-                    f"Tried to terminate tool '{name}' (PID: {process.pid}) but it is still alive."
-                )
+        for name in names:
+            self._processes[name].stop()
+
+        # the processes exit concurrently, so a single wait on all their sentinels
+        # replaces one blocking join per process
+        deadline = monotonic() + 10
+        alive = {self._processes[name].sentinel: name for name in names}
+        while alive:
+            timeout = deadline - monotonic()
+            if timeout <= 0:
+                break
 
-        for _ in self._pool.map(
-            stop_process, (self._processes[name] for name in names)
-        ):
-            pass
+            for sentinel in wait(list(alive), timeout=timeout):
+                self._processes[alive.pop(sentinel)].join()
+
+        for name in alive.values():
+            process = self._processes[name]
+            self._logger.warning(
+                f"Tried to terminate tool '{name}' (PID: {process.pid}) but it is still alive."
+            )
 
         for name in names:
             del self._conns[name]
+            del self._locks[name]
             del self._processes[name]
+            del self._pending[name]
+            del self._readers[name]
+            del self._stopped[name]
+            self._tool_infos.pop(name, None)
 
         return self
 
@@ -116,32 +200,122 @@ class ToolManager:
         self,
         tool: str,
         function: str,
-        args: List[Any] = list(),
-        kwargs: Dict[str, Any] = dict(),
+        args: Optional[List[Any]] = None,
+        kwargs: Optional[Dict[str, Any]] = None,
     ) -> Any:
-        if tool not in self._conns:
-            raise ValueError(f'Tool named "{tool}" does not exist!')
-        else:
-            conn = self._conns[tool]
-            conn.send(Call(function=function, args=args, kwargs=kwargs))
-            result: CallResult = conn.recv()
-
-            if result.error is not None:
-                raise RuntimeError(
-                    f"Error when calling {tool}:\n"
-                    f"> function: {function}\n"
-                    f"> args: {args}\n"
-                    f"> kwargs: {kwargs}\n"
-                    f"Error message:\n{result.error}"
-                )
-            else:
-                return result.result
+        return self.call_async(tool, function, args, kwargs).result()
 
     def call_async(
         self,
         tool: str,
         function: str,
-        args: List[Any] = list(),
-        kwargs: Dict[str, Any] = dict(),
+        args: Optional[List[Any]] = None,
+        kwargs: Optional[Dict[str, Any]] = None,
     ) -> Future:
-        return self._pool.submit(self.call, tool, function, args, kwargs)
+        args = args or []
+        kwargs = kwargs or {}
+
+        return self._send(tool, (function, args, kwargs))
+
+    def call_many(self, tool: str, calls: List[Call]) -> List[Any]:
+        # the calls travel to the tool and back as one message each way
+        replies: List[ToolReply] = self._send(
+            tool, [(call.function, call.args, call.kwargs) for call in calls]
+        ).result()
+
+        for call, (_, error) in zip(calls, replies):
+            if error is not None:
+                raise ToolCallError(tool, call.function, call.args, call.kwargs, error)
+
+        return [result for result, _ in replies]
+
+    def _send(
+        self, tool: str, request: Union[ToolRequest, List[ToolRequest]]
+    ) -> Future:
+        # failures are reported through the future, as for errors raised by the tool
+        future = Future()
+        if tool not in self._conns:
+            future.set_exception(ValueError(f'Tool named "{tool}" does not exist!'))
+            return future
+
+        with self._locks[tool]:
+            # checked under the lock, so the reader has either not yet failed the
+            # pending calls of an exited tool or the call is refused here
+            if self._stopped[tool].is_set():
+                future.set_exception(
+                    RuntimeError(
+                        f"Tool has stopped before calling {_describe(tool, request)}"
+                    )
+                )
+                return future
+
+            self._pending[tool].append((future, request))
+            self._conns[tool].send(request)
+
+        return future
+
+    def _start_reader(self, name: str) -> None:
+        self._readers[name] = Thread(
+            target=self._read_results,
+            args=(
+                name,
+                self._conns[name],
+                self._locks[name],
+                self._processes[name],
+                self._pending[name],
+                self._stopped[name],
+            ),
+            daemon=True,
+        )
+        self._readers[name].start()
+
+    def _read_results(
+        self,
+        name: str,
+        conn: Connection,
+        lock: Lock,
+        process: ToolProcess,
+        pending: Deque[Tuple[Future, Union[ToolRequest, List[ToolRequest]]]],
+        stopped: Event,
+    ) -> None:
+        # results are resolved here instead of by a thread blocked on each call, and
+        # the process sentinel ends the loop once the tool has exited
+        while conn in wait([conn, process.sentinel]):
+            try:
+                reply: Union[ToolReply, List[ToolReply]] = conn.recv()
+            except EOFError:
+                break
+
+            if not pending:
+                self._logger.warning(f"Tool sent an unexpected reply: {reply}")
+                continue
+
+            future, request = pending.popleft()
+            if isinstance(reply, list):
+                future.set_result(reply)
+                continue
+
+            result, error = reply
+            if error is None:
+                future.set_result(result)
+            elif isinstance(request, list):
+                # the batch as a whole failed, e.g. its results could not be sent
+                future.set_exception(
+                    RuntimeError(
+                        f"Error when calling {_describe(name, request)}"
+                        f"Error message:\n{error}"
+                    )
+                )
+            else:
+                future.set_exception(ToolCallError(name, *request, error))
+
+        with lock:
+            while pending:
+                future, request = pending.popleft()
+                future.set_exception(
+                    RuntimeError(
+                        f"Tool has stopped while calling {_describe(name, request)}"
+                    )
+                )
+
+            stopped.set()
@@ -1,12 +1,18 @@
-import time
 import traceback
-from multiprocessing import Event, Process
-from multiprocessing.connection import Connection
-from typing import Type
+from multiprocessing import Event, Pipe, Process
+from multiprocessing.connection import Connection, wait
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
 
 from jaiger.configs import ToolConfig
-from jaiger.models import Call, CallResult
 from jaiger.tool.tool import Tool
+from jaiger.utils import format_error
+
+# calls and results cross the pipe as plain tuples, which pickle several times faster
+# than models; a batch of calls is sent as a list and answered with a list
+# (function, args, kwargs)
+ToolRequest = Tuple[str, List[Any], Dict[str, Any]]
+# (result, error)
+ToolReply = Tuple[Any, Optional[str]]
 
 
 class ToolProcess(Process):
@@ -26,6 +32,9 @@ class ToolProcess(Process):
         self._config = config
         self._conn = conn
 
+        # lets stop() wake the process while it is blocked waiting for a call
+        self._stop_r, self._stop_w = Pipe(duplex=False)
+
     def run(self):
         self._start_event.set()
 
@@ -35,32 +44,29 @@ class ToolProcess(Process):
             tool = self._tool_class(self._config)
             tool.setup()
             while not self._stop_event.is_set():
+                if self._stop_r in wait([self._conn, self._stop_r]):
+                    break
+
                 try:
-                    if self._conn.poll():
-                        request: Call = self._conn.recv()
-                        function = getattr(tool, request.function)
-                        self._conn.send(
-                            CallResult(result=function(*request.args, **request.kwargs))
-                        )
+                    request: Union[ToolRequest, List[ToolRequest]] = self._conn.recv()
+                except EOFError:
+                    # the manager has closed its end, so no more calls can arrive
+                    break
 
-                except Exception as e:
+                try:
+                    # a batch is answered with a single message holding every result
                     self._conn.send(
-                        CallResult(
-                            error="".join(
-                                traceback.TracebackException.from_exception(e).format()
-                            )
-                        )
+                        [self._call(tool, call) for call in request]
+                        if isinstance(request, list)
+                        else self._call(tool, request)
                     )
 
-                time.sleep(0)
+                except Exception as e:
+                    self._conn.send((None, format_error(e)))
 
         except Exception as e:
             self._conn.send(
-                CallResult(
-                    error="".join(
-                        traceback.TracebackException.from_exception(e).format()
-                    )
-                )
+                (None, "".join(traceback.TracebackException.from_exception(e).format()))
             )
 
         finally:
@@ -69,5 +75,14 @@ class ToolProcess(Process):
 
             self._conn.close()
 
+    def _call(self, tool: Tool, request: ToolRequest) -> ToolReply:
+        function, args, kwargs = request
+        try:
+            return getattr(tool, function)(*args, **kwargs), None
+
+        except Exception as e:
+            return None, format_error(e)
+
     def stop(self):
         self._stop_event.set()
+        self._stop_w.send(None)
@@ -1,42 +1,74 @@
 import importlib
-import re
-from typing import Any, Dict, Literal, Type, Union, get_origin
+import traceback
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Literal, Type, Union, get_origin
 
 from pydantic import BaseModel
 
 from jaiger.tool.tool import Tool
 
 
+# a tool type always resolves to the same class, so it only needs importing once
+@lru_cache(maxsize=None)
 def get_tool_class(type: str) -> Type[Tool]:
-    match = re.search("(.+)\.(.+)", type)
-    if match is None:
+    module_name, _, tool_class = type.rpartition(".")
+    if not module_name or not tool_class:
         raise ValueError(f'Invalid tool type "{type}".')
 
-    module_name = match.group(1)
-    tool_class = match.group(2)
-
     mod = importlib.import_module(module_name)
     return getattr(mod, tool_class)
 
 
-def _dispatch(t: type) -> Union[str, dict]:
-    origin = get_origin(t)
-    if origin is Union:
-        return " | ".join((_dispatch(type) for type in t.__args__))
-    elif origin is Literal:
-        return " | ".join((_dispatch(value) for value in t.__args__))
-    elif origin is list:
-        return f"List[{_dispatch(t.__args__[0])}]"
-    elif origin is dict:
-        return f"Dict[{_dispatch(t.__args__[0])}, {_dispatch(t.__args__[1])}]"
-    elif origin is None:
-        if t is Any:
-            return str(t)
-        if issubclass(t, BaseModel):
-            return get_type_schema(t)
-        else:
-            return t.__name__
+def _format_union(t: Any) -> str:
+    return " | ".join([_dispatch(type_) for type_ in t.__args__])
+
+
+def _format_literal(t: Any) -> str:
+    # literal arguments are values rather than types
+    return " | ".join([repr(value) for value in t.__args__])
+
+
+def _format_list(t: Any) -> str:
+    return f"List[{_dispatch(t.__args__[0])}]"
+
+
+def _format_dict(t: Any) -> str:
+    return f"Dict[{_dispatch(t.__args__[0])}, {_dispatch(t.__args__[1])}]"
+
+
+_ORIGIN_FORMATTERS: Dict[Any, Callable[[Any], str]] = {
+    Union: _format_union,
+    Literal: _format_literal,
+    list: _format_list,
+    dict: _format_dict,
+}
+
+
+def _dispatch(t: Any) -> Union[str, dict]:
+    formatter = _ORIGIN_FORMATTERS.get(get_origin(t))
+    if formatter is not None:
+        return formatter(t)
+
+    if t is Any:
+        return str(t)
+
+    if isinstance(t, type) and issubclass(t, BaseModel):
+        return get_type_schema(t)
+
+    # generics without a formatter of their own are shown as written
+    return t.__name__ if isinstance(t, type) else str(t)
 
 
 def get_type_schema(model: Type[BaseModel]) -> Dict[str, Union[str, dict]]:
     return {name: _dispatch(type_) for name, type_ in model.__annotations__.items()}
+
+
+def format_error(e: BaseException) -> str:
+    # formatting the whole stack is costly when calls keep failing
+    return "".join(traceback.format_exception_only(type(e), e))
+
+
+def describe_call(
+    target: str, function: str, args: List[Any], kwargs: Dict[str, Any]
+) -> str:
+    return f"{target}:\n> function: {function}\n> args: {args}\n> kwargs: {kwargs}\n"